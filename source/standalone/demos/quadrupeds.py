@@ -55,9 +55,13 @@ def define_origins(num_origins: int, spacing: float) -> list[list[float]]:
     # create a grid of origins
     num_cols = np.floor(np.sqrt(num_origins))
     num_rows = np.ceil(num_origins / num_cols)
-    xx, yy = torch.meshgrid(torch.arange(num_rows), torch.arange(num_cols), indexing="xy")
-    env_origins[:, 0] = spacing * xx.flatten()[:num_origins] - spacing * (num_rows - 1) / 2
-    env_origins[:, 1] = spacing * yy.flatten()[:num_origins] - spacing * (num_cols - 1) / 2
+    # note: origins are filled along the rows first, i.e. the i-th origin is at
+    #   row i % num_rows and column i // num_rows
+    idx = torch.arange(num_origins)
+    rows = idx % int(num_rows)
+    cols = idx // int(num_rows)
+    env_origins[:, 0] = spacing * rows - spacing * (num_rows - 1) / 2
+    env_origins[:, 1] = spacing * cols - spacing * (num_cols - 1) / 2
     env_origins[:, 2] = 0.0
     # return the origins
     return env_origins.tolist()
@@ -130,6 +134,13 @@ def run_simulator(sim: sim_utils.SimulationContext, entities: dict[str, Articula
     sim_dt = sim.get_physics_dt()
     sim_time = 0.0
     count = 0
+    # group robots with the same joint layout so that their action noise is sampled at once
+    robot_groups: dict[tuple[int, ...], list[Articulation]] = {}
+    for robot in entities.values():
+        robot_groups.setdefault(tuple(robot.data.joint_pos.shape), []).append(robot)
+    noise_pool = {
+        shape: torch.empty((len(robots), *shape), device=sim.device) for shape, robots in robot_groups.items()
+    }
     # Simulate physics
     while simulation_app.is_running():
         # reset
@@ -150,13 +161,16 @@ def run_simulator(sim: sim_utils.SimulationContext, entities: dict[str, Articula
                 robot.reset()
             print("[INFO]: Resetting robots state...")
         # apply default actions to the quadrupedal robots
-        for robot in entities.values():
-            # generate random joint positions
-            joint_pos_target = robot.data.default_joint_pos + torch.randn_like(robot.data.joint_pos) * 0.1
-            # apply action to the robot
-            robot.set_joint_position_target(joint_pos_target)
-            # write data to sim
-            robot.write_data_to_sim()
+        for shape, robots in robot_groups.items():
+            # sample the joint position noise for the whole group
+            noise = noise_pool[shape].normal_(0.0, 0.1)
+            for robot, robot_noise in zip(robots, noise):
+                # generate random joint positions
+                joint_pos_target = robot.data.default_joint_pos + robot_noise
+                # apply action to the robot
+                robot.set_joint_position_target(joint_pos_target)
+                # write data to sim
+                robot.write_data_to_sim()
         # perform step
         sim.step()
         # update sim-time
@@ -105,7 +105,7 @@ class PickSmWaitTime:
 
 @wp.kernel
 def infer_state_machine(
-    dt: wp.array(dtype=float),
+    dt: float,
     sm_state: wp.array(dtype=int),
     sm_wait_time: wp.array(dtype=float),
     ee_pose: wp.array(dtype=wp.transform),
@@ -166,7 +166,7 @@ def infer_state_machine(
             sm_state[tid] = PickSmState.LIFT_OBJECT
             sm_wait_time[tid] = 0.0
     # increment wait time
-    sm_wait_time[tid] = sm_wait_time[tid] + dt[tid]
+    sm_wait_time[tid] = sm_wait_time[tid] + dt
 
 
 class PickAndLiftSm:
@@ -197,7 +197,6 @@ class PickAndLiftSm:
         self.num_envs = num_envs
         self.device = device
         # initialize state machine
-        self.sm_dt = torch.full((self.num_envs,), self.dt, device=self.device)
         self.sm_state = torch.full(
             (self.num_envs,), 0, dtype=torch.int32, device=self.device
         )
@@ -214,7 +213,6 @@ class PickAndLiftSm:
         # print("[DEBUG] offset: ", self.offset)
 
         # convert to warp
-        self.sm_dt_wp = wp.from_torch(self.sm_dt, wp.float32)
         self.sm_state_wp = wp.from_torch(self.sm_state, wp.int32)
         self.sm_wait_time_wp = wp.from_torch(self.sm_wait_time, wp.float32)
         self.des_ee_pose_wp = wp.from_torch(self.des_ee_pose, wp.transform)
@@ -276,7 +274,7 @@ class PickAndLiftSm:
             kernel=infer_state_machine,
             dim=self.num_envs,
             inputs=[
-                self.sm_dt_wp,
+                self.dt,
                 self.sm_state_wp,
                 self.sm_wait_time_wp,
                 ee_pose_wp,
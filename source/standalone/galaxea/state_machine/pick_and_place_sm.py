@@ -49,7 +49,7 @@ class PickSmWaitTime:
 
 @wp.kernel
 def infer_state_machine(
-    dt: wp.array(dtype=float),
+    dt: float,
     sm_state: wp.array(dtype=int),
     sm_wait_time: wp.array(dtype=float),
     ee_pose: wp.array(dtype=wp.transform),
@@ -111,7 +111,7 @@ def infer_state_machine(
         if sm_wait_time[tid] >= PickSmWaitTime.RELEASE_OBJECT:
             sm_state[tid] = PickSmState.RELEASE_OBJECT
             sm_wait_time[tid] = 0.0        
-    sm_wait_time[tid] = sm_wait_time[tid] + dt[tid]
+    sm_wait_time[tid] = sm_wait_time[tid] + dt
 
 class PickAndPlaceRightArmSm:
     """A variaty of PickAndLiftSm, using right arm only.
@@ -143,7 +143,6 @@ class PickAndPlaceRightArmSm:
         self.device = device
         self.task = task
         # initialize state machine
-        self.sm_dt = torch.full((self.num_envs,), self.dt, device=self.device)
         self.sm_state = torch.full(
             (self.num_envs,), 0, dtype=torch.int32, device=self.device
         )
@@ -158,7 +157,6 @@ class PickAndPlaceRightArmSm:
         # print("[DEBUG] offset: ", self.offset)
         self.set_task_config()
         # convert to warp
-        self.sm_dt_wp = wp.from_torch(self.sm_dt, wp.float32)
         self.sm_state_wp = wp.from_torch(self.sm_state, wp.int32)
         self.sm_wait_time_wp = wp.from_torch(self.sm_wait_time, wp.float32)
         self.des_ee_pose_wp = wp.from_torch(self.des_ee_pose, wp.transform)
@@ -204,7 +202,7 @@ class PickAndPlaceRightArmSm:
             kernel=infer_state_machine,
             dim=self.num_envs,
             inputs=[
-                self.sm_dt_wp,
+                self.dt,
                 self.sm_state_wp,
                 self.sm_wait_time_wp,
                 ee_pose_wp,
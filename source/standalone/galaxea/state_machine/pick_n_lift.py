@@ -2,11 +2,7 @@ import torch
 import warp as wp
 import gymnasium as gym
 from collections.abc import Sequence
-from omni.isaac.lab.utils.math import (
-    combine_frame_transforms,
-    quat_from_euler_xyz,
-    euler_xyz_from_quat,
-)
+from omni.isaac.lab.utils.math import combine_frame_transforms
 
 
 # initialize warp
@@ -28,6 +24,7 @@ class PickSmState:
     APPROACH_OBJECT = wp.constant(2)
     GRASP_OBJECT = wp.constant(3)
     LIFT_OBJECT = wp.constant(4)
+    DONE = wp.constant(5)
 
 
 class PickSmWaitTime:
@@ -40,73 +37,89 @@ class PickSmWaitTime:
     LIFT_OBJECT = wp.constant(1.0)
 
 
-@wp.kernel
+# lookup table type with one entry per active state of the pick state machine
+vec5 = wp.types.vector(length=5, dtype=float)
+
+
+# note: the state machine is not differentiable, so no adjoint kernel is generated
+@wp.kernel(enable_backward=False)
 def infer_state_machine(
-    dt: wp.array(dtype=float),
+    dt: float,
     sm_state: wp.array(dtype=int),
     sm_wait_time: wp.array(dtype=float),
     ee_pose: wp.array(dtype=wp.transform),
     object_pose: wp.array(dtype=wp.transform),
     des_object_pose: wp.array(dtype=wp.transform),
-    des_ee_pose: wp.array(dtype=wp.transform),
-    gripper_state: wp.array(dtype=float),
-    offset: wp.array(dtype=wp.transform),
+    actions: wp.array(dtype=float),
+    offset: wp.transform,
 ):
     # retrieve thread id
     tid = wp.tid()
     # retrieve state machine state
     state = sm_state[tid]
-    # decide next state
-    if state == PickSmState.REST:
-        des_ee_pose[tid] = ee_pose[tid]
-        gripper_state[tid] = GripperState.OPEN
-        # wait for a while
-        if sm_wait_time[tid] >= PickSmWaitTime.REST:
-            # move to next state and reset wait time
-            sm_state[tid] = PickSmState.APPROACH_ABOVE_OBJECT
-            sm_wait_time[tid] = 0.0
-    elif state == PickSmState.APPROACH_ABOVE_OBJECT:
-        des_ee_pose[tid] = wp.transform_multiply(offset[tid], object_pose[tid])
-        gripper_state[tid] = GripperState.OPEN
-        # TODO: error between current and desired ee pose below threshold
-        # wait for a while
-        if sm_wait_time[tid] >= PickSmWaitTime.APPROACH_OBJECT:
-            # move to next state and reset wait time
-            sm_state[tid] = PickSmState.APPROACH_OBJECT
-            sm_wait_time[tid] = 0.0
-    elif state == PickSmState.APPROACH_OBJECT:
-        des_ee_pose[tid] = object_pose[tid]
-        # des_ee_pose[tid] = wp.transform_multiply(offset[tid], object_pose[tid])
-        gripper_state[tid] = GripperState.OPEN
-        # TODO: error between current and desired ee pose below threshold
-        # wait for a while
-        if sm_wait_time[tid] >= PickSmWaitTime.APPROACH_OBJECT:
-            # move to next state and reset wait time
-            sm_state[tid] = PickSmState.GRASP_OBJECT
-            sm_wait_time[tid] = 0.0
-    elif state == PickSmState.GRASP_OBJECT:
-        des_ee_pose[tid] = object_pose[tid]
-        # des_ee_pose[tid] = wp.transform_multiply(offset[tid], object_pose[tid])
-        gripper_state[tid] = GripperState.CLOSE
-        # wait for a while
-        if sm_wait_time[tid] >= PickSmWaitTime.GRASP_OBJECT:
-            # move to next state and reset wait time
-            sm_state[tid] = PickSmState.LIFT_OBJECT
-            sm_wait_time[tid] = 0.0
-    elif state == PickSmState.LIFT_OBJECT:
-        des_ee_pose[tid] = des_object_pose[tid]
-        gripper_state[tid] = GripperState.CLOSE
-        # TODO: error between current and desired ee pose below threshold
-        # wait for a while
-        if sm_wait_time[tid] >= PickSmWaitTime.LIFT_OBJECT:
-            # move to next state and reset wait time
-            sm_state[tid] = PickSmState.LIFT_OBJECT
-            sm_wait_time[tid] = 0.0
+    # finished state machines keep their last actions until they are reset
+    if state == PickSmState.DONE:
+        return
+    # per-state lookup tables, indexed by the state machine state
+    # note: APPROACH_ABOVE_OBJECT waits for the APPROACH_OBJECT time before switching
+    wait_times = vec5(
+        PickSmWaitTime.REST,
+        PickSmWaitTime.APPROACH_OBJECT,
+        PickSmWaitTime.APPROACH_OBJECT,
+        PickSmWaitTime.GRASP_OBJECT,
+        PickSmWaitTime.LIFT_OBJECT,
+    )
+    gripper_states = vec5(
+        GripperState.OPEN,
+        GripperState.OPEN,
+        GripperState.OPEN,
+        GripperState.CLOSE,
+        GripperState.CLOSE,
+    )
+    # candidate desired poses, blended with one-hot weights so that all threads in a
+    # warp run the same instructions regardless of their state
+    # TODO: error between current and desired ee pose below threshold
+    rest_pose = ee_pose[tid]
+    above_pose = wp.transform_multiply(offset, object_pose[tid])
+    grasp_pose = object_pose[tid]
+    lift_pose = des_object_pose[tid]
+    w_rest = float(state == PickSmState.REST)
+    w_above = float(state == PickSmState.APPROACH_ABOVE_OBJECT)
+    w_grasp = float(
+        state == PickSmState.APPROACH_OBJECT or state == PickSmState.GRASP_OBJECT
+    )
+    w_lift = float(state == PickSmState.LIFT_OBJECT)
+    des_pos = (
+        w_rest * wp.transform_get_translation(rest_pose)
+        + w_above * wp.transform_get_translation(above_pose)
+        + w_grasp * wp.transform_get_translation(grasp_pose)
+        + w_lift * wp.transform_get_translation(lift_pose)
+    )
+    des_rot = (
+        w_rest * wp.transform_get_rotation(rest_pose)
+        + w_above * wp.transform_get_rotation(above_pose)
+        + w_grasp * wp.transform_get_rotation(grasp_pose)
+        + w_lift * wp.transform_get_rotation(lift_pose)
+    )
+    # write the desired end-effector pose with quaternion as (w, x, y, z) followed
+    # by the gripper command
+    actions[tid * 8 + 0] = des_pos[0]
+    actions[tid * 8 + 1] = des_pos[1]
+    actions[tid * 8 + 2] = des_pos[2]
+    actions[tid * 8 + 3] = des_rot[3]
+    actions[tid * 8 + 4] = des_rot[0]
+    actions[tid * 8 + 5] = des_rot[1]
+    actions[tid * 8 + 6] = des_rot[2]
+    actions[tid * 8 + 7] = gripper_states[state]
+    # move to next state and reset wait time once waited for long enough
+    wait_time = sm_wait_time[tid]
+    advance = int(wait_time >= wait_times[state])
+    sm_state[tid] = state + advance
     # increment wait time
-    sm_wait_time[tid] = sm_wait_time[tid] + dt[tid]
+    sm_wait_time[tid] = wait_time * float(1 - advance) + dt
 
 
-class PickAndLiftSm:
+class _PickSmBase:
     """A simple state machine in a robot's task space to pick and lift an object.
 
     The state machine is implemented as a warp kernel. It takes in the current state of
@@ -118,9 +131,17 @@ class PickAndLiftSm:
     2. APPROACH_ABOVE_OBJECT: The robot moves above the object.
     3. APPROACH_OBJECT: The robot moves to the object.
     4. GRASP_OBJECT: The robot grasps the object.
-    5. LIFT_OBJECT: The robot lifts the object to the desired pose. This is the final state.
+    5. LIFT_OBJECT: The robot lifts the object to the desired pose.
+    6. DONE: The robot holds the last desired pose. This is the final state.
+
+    Subclasses define the number of arms driven by the state machine and how the actions
+    are generated from the scene. All arms are advanced in a single launch, with the
+    state machines of the i-th arm occupying [i * num_envs, (i + 1) * num_envs).
     """
 
+    num_arms: int = 1
+    """The number of arms driven by the state machine."""
+
     def __init__(
         self, task: str, dt: float, num_envs: int, device: torch.device | str = "cpu"
     ):
@@ -136,32 +157,60 @@ class PickAndLiftSm:
         self.num_envs = num_envs
         self.device = device
         self.task = task
+        self._num_sm = self.num_arms * self.num_envs
         # initialize state machine
-        self.sm_dt = torch.full((self.num_envs,), self.dt, device=self.device)
         self.sm_state = torch.full(
-            (self.num_envs,), 0, dtype=torch.int32, device=self.device
+            (self._num_sm,), 0, dtype=torch.int32, device=self.device
         )
-        self.sm_wait_time = torch.zeros((self.num_envs,), device=self.device)
+        self.sm_wait_time = torch.zeros((self._num_sm,), device=self.device)
 
-        # desired state
-        self.des_ee_pose = torch.zeros((self.num_envs, 7), device=self.device)
-        self.des_gripper_state = torch.full((self.num_envs,), 0.0, device=self.device)
+        # desired state: end-effector pose (x, y, z, qw, qx, qy, qz) and gripper command
+        self.actions_buf = torch.zeros((self._num_sm, 8), device=self.device)
 
         # approach above object offset
-        self.offset = torch.zeros((self.num_envs, 7), device=self.device)
-        self.offset[:, 2] = 0.1
-        self.offset[:, -1] = 1.0  # warp expects quaternion as (x, y, z, w)
+        # note: warp expects quaternion as (x, y, z, w)
+        self.offset = wp.transform((0.0, 0.0, 0.1), (0.0, 0.0, 0.0, 1.0))
         # print("[DEBUG] offset: ", self.offset)
 
         self.set_task_config()
 
+        # index tensors to reorder quaternions
+        self._wxyz_to_xyzw = torch.tensor([0, 1, 2, 4, 5, 6, 3], device=self.device)
+
+        # persistent input buffers, filled in-place during compute
+        self._ee_buf = torch.empty((self._num_sm, 7), device=self.device)
+        self._obj_buf = torch.empty((self._num_sm, 7), device=self.device)
+        self._des_obj_buf = torch.empty((self._num_sm, 7), device=self.device)
+
+        # scratch buffers for generate_actions, stacked per arm
+        self._ee_in = torch.empty((self._num_sm, 7), device=self.device)
+        # note: the (z, y) entries (columns 3 and 6) of the desired orientation
+        #   are always zero
+        self._obj_in = torch.zeros((self._num_sm, 7), device=self.device)
+        self._des_in = torch.empty((self._num_sm, 7), device=self.device)
+        self._half_angle = torch.empty((self._num_sm,), device=self.device)
+        self._obj_pos_buf = torch.empty((self.num_envs, 3), device=self.device)
+
+        # scene entities, looked up once per environment instance
+        self._cached_env = None
+
         # convert to warp
-        self.sm_dt_wp = wp.from_torch(self.sm_dt, wp.float32)
+        self._ee_wp = wp.from_torch(self._ee_buf, wp.transform)
+        self._obj_wp = wp.from_torch(self._obj_buf, wp.transform)
+        self._des_obj_wp = wp.from_torch(self._des_obj_buf, wp.transform)
         self.sm_state_wp = wp.from_torch(self.sm_state, wp.int32)
         self.sm_wait_time_wp = wp.from_torch(self.sm_wait_time, wp.float32)
-        self.des_ee_pose_wp = wp.from_torch(self.des_ee_pose, wp.transform)
-        self.des_gripper_state_wp = wp.from_torch(self.des_gripper_state, wp.float32)
-        self.offset_wp = wp.from_torch(self.offset, wp.transform)
+        self.actions_buf_wp = wp.from_torch(self.actions_buf.view(-1), wp.float32)
+
+        # capture the state machine launch into a CUDA graph so that each step
+        # only needs a single replay instead of a full kernel dispatch
+        self._graph = None
+        if wp.get_device(self.device).is_cuda:
+            # make sure the kernel is compiled before the capture starts
+            wp.load_module(device=self.device)
+            with wp.ScopedCapture(device=self.device) as capture:
+                self._launch_state_machine()
+            self._graph = capture.graph
 
     def set_task_config(self):
         # offsets for different tasks
@@ -178,311 +227,220 @@ class PickAndLiftSm:
         else:
             raise ValueError(f"Unsupported task: {self.task} for generating actions.")
         print("task: {}, offset: {}".format(self.task, self.task_offset))
+        # cache the offsets used at every step as python floats
+        self._off_y = float(self.task_offset[1].item())
+        self._off_z = float(self.task_offset[2].item())
+        self._off_yaw = float(self.task_offset[5].item())
 
     def reset_idx(self, env_ids: Sequence[int] = None):
         """Reset the state machine."""
         if env_ids is None:
             env_ids = slice(None)
-        self.sm_state[env_ids] = 0
-        self.sm_wait_time[env_ids] = 0.0
-
-    def compute(
-        self,
-        ee_pose: torch.Tensor,
-        object_pose: torch.Tensor,
-        des_object_pose: torch.Tensor,
-    ):
-        """Compute the desired state of the robot's end-effector and the gripper."""
-        # convert all transformations from (w, x, y, z) to (x, y, z, w)
-        ee_pose = ee_pose[:, [0, 1, 2, 4, 5, 6, 3]]
-        object_pose = object_pose[:, [0, 1, 2, 4, 5, 6, 3]]
-        des_object_pose = des_object_pose[:, [0, 1, 2, 4, 5, 6, 3]]
-
-        # convert to warp
-        ee_pose_wp = wp.from_torch(ee_pose.contiguous(), wp.transform)
-        object_pose_wp = wp.from_torch(object_pose.contiguous(), wp.transform)
-        des_object_pose_wp = wp.from_torch(des_object_pose.contiguous(), wp.transform)
+        # reset all arms of the selected environments
+        self.sm_state.view(self.num_arms, self.num_envs)[:, env_ids] = 0
+        self.sm_wait_time.view(self.num_arms, self.num_envs)[:, env_ids] = 0.0
 
-        # run state machine
+    def _launch_state_machine(self):
+        """Launch the state machine kernel on the persistent buffers."""
         wp.launch(
             kernel=infer_state_machine,
-            dim=self.num_envs,
+            dim=self._num_sm,
             inputs=[
-                self.sm_dt_wp,
+                self.dt,
                 self.sm_state_wp,
                 self.sm_wait_time_wp,
-                ee_pose_wp,
-                object_pose_wp,
-                des_object_pose_wp,
-                self.des_ee_pose_wp,
-                self.des_gripper_state_wp,
-                self.offset_wp,
+                self._ee_wp,
+                self._obj_wp,
+                self._des_obj_wp,
+                self.actions_buf_wp,
+                self.offset,
             ],
             device=self.device,
         )
 
-        # convert transformations back to (w, x, y, z)
-        des_ee_pose = self.des_ee_pose[:, [0, 1, 2, 6, 3, 4, 5]]
-        # print("des_ee_pose: ", des_ee_pose)
-        # convert to torch
-        return torch.cat([des_ee_pose, self.des_gripper_state.unsqueeze(-1)], dim=-1)
-
-    def generate_actions(self, env: gym.Env, goal_pos: torch.Tensor) -> torch.Tensor:
-        # -- end-effector frame
-        left_ee_frame = env.unwrapped.scene["left_ee_frame"]
-        left_tcp_rest_position = (
-            left_ee_frame.data.target_pos_w[..., 0, :] - env.unwrapped.scene.env_origins
+    def _update_scene_cache(self, env: gym.Env):
+        """Look up the scene entities used for generating actions."""
+        if env is not self._cached_env:
+            scene = env.unwrapped.scene
+            self._left_ee = scene["left_ee_frame"]
+            self._right_ee = scene["right_ee_frame"]
+            self._obj = scene["object"]
+            self._env_origins = scene.env_origins
+            self._cached_env = env
+
+    def _write_ee_pose(self, ee_frame, out: torch.Tensor):
+        """Write the end-effector pose w.r.t. the environment origins into ``out``."""
+        ee_data = ee_frame.data
+        torch.sub(ee_data.target_pos_w[..., 0, :], self._env_origins, out=out[:, :3])
+        out[:, 3:7] = ee_data.target_quat_w[..., 0, :]
+
+    def _object_yaw(self, object_orientation: torch.Tensor) -> torch.Tensor:
+        """Compute the yaw (z-axis rotation) of an orientation in (w, x, y, z)."""
+        q_w, q_x, q_y, q_z = object_orientation.unbind(-1)
+        return torch.atan2(
+            2.0 * (q_w * q_z + q_x * q_y), 1 - 2 * (q_y * q_y + q_z * q_z)
         )
-        left_tcp_rest_orientation = left_ee_frame.data.target_quat_w[..., 0, :]
 
-        right_ee_frame = env.unwrapped.scene["right_ee_frame"]
-        right_tcp_rest_position = (
-            right_ee_frame.data.target_pos_w[..., 0, :]
-            - env.unwrapped.scene.env_origins
+    def _object_frame(self) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Get the object position w.r.t. the env origins, orientation and yaw."""
+        object_data = self._obj.data
+        object_position = torch.sub(
+            object_data.root_pos_w, self._env_origins, out=self._obj_pos_buf
         )
-        right_tcp_rest_orientation = right_ee_frame.data.target_quat_w[..., 0, :]
-
-        # -- object frame
-        object_data = env.unwrapped.scene["object"].data
-        object_position = object_data.root_pos_w - env.unwrapped.scene.env_origins
         object_orientation = object_data.root_quat_w
-        object_orientation_yaw = euler_xyz_from_quat(object_orientation)[2]
+        return object_position, object_orientation, self._object_yaw(object_orientation)
 
-        # -- the grasping poses on object for left/right grippers
-        left_object_offset = torch.zeros_like(object_position)
-        left_object_offset[:, 1] = self.task_offset[1]
-        left_object_offset[:, 2] = self.task_offset[2]
-        left_object_position, _ = combine_frame_transforms(
-            object_position, object_orientation, left_object_offset
-        )
+    def _write_desired_orientation(self):
+        """Write the desired orientation from the offset angles in ``_half_angle``.
 
-        right_object_offset = torch.zeros_like(object_position)
-        right_object_offset[:, 1] = -self.task_offset[1]
-        right_object_offset[:, 2] = self.task_offset[2]
-        right_object_position, _ = combine_frame_transforms(
-            object_position, object_orientation, right_object_offset
-        )
+        The offset angle is a pure rotation about x, whose quaternion (w, x, y, z) is
+        (cos(a / 2), sin(a / 2), 0, 0). Converted to (z, w, x, y) only the two middle
+        entries are non-zero, so they are written directly.
+        """
+        self._half_angle *= 0.5
+        torch.cos(self._half_angle, out=self._obj_in[:, 4])
+        torch.sin(self._half_angle, out=self._obj_in[:, 5])
+        self._des_in[:, 3:] = self._obj_in[:, 3:]
 
-        # -- update left desired position
-        left_desired_position = goal_pos.clone()
-        left_desired_position[:, 1] += self.task_offset[1]
-        # -- update left desired orientation
-        l_orientation_offset_euler = torch.zeros_like(left_object_position)
-        l_orientation_offset_euler[:, 0] = object_orientation_yaw - self.task_offset[5]
-        l_orientation_offset_quat = quat_from_euler_xyz(
-            l_orientation_offset_euler[:, 0],
-            l_orientation_offset_euler[:, 1],
-            l_orientation_offset_euler[:, 2],
-        )
-        # conver to (z, w, x, y)
-        left_desired_orientation = l_orientation_offset_quat[:, [3, 0, 1, 2]]
+    def compute(
+        self,
+        ee_pose: torch.Tensor,
+        object_pose: torch.Tensor,
+        des_object_pose: torch.Tensor,
+    ):
+        """Compute the desired state of the robot's end-effector and the gripper.
 
-        # -- update right desired position
-        right_desired_position = goal_pos.clone()
-        right_desired_position[:, 1] -= self.task_offset[1]
-        # -- update right desired orientation
-        r_orientation_offset_euler = torch.zeros_like(right_object_position)
-        r_orientation_offset_euler[:, 0] = object_orientation_yaw + self.task_offset[5]
-        r_orientation_offset_quat = quat_from_euler_xyz(
-            r_orientation_offset_euler[:, 0],
-            r_orientation_offset_euler[:, 1],
-            r_orientation_offset_euler[:, 2],
-        )
-        # conver to (z, w, x, y)
-        right_desired_orientation = r_orientation_offset_quat[:, [3, 0, 1, 2]]
-
-        # advance state machine
-        left_actions = self.compute(
-            torch.cat([left_tcp_rest_position, left_tcp_rest_orientation], dim=-1),
-            torch.cat([left_object_position, left_desired_orientation], dim=-1),
-            torch.cat([left_desired_position, left_desired_orientation], dim=-1),
-        )
+        The input poses are stacked per arm, i.e. they have shape (num_arms * num_envs, 7).
 
-        right_actions = self.compute(
-            torch.cat([right_tcp_rest_position, right_tcp_rest_orientation], dim=-1),
-            torch.cat([right_object_position, right_desired_orientation], dim=-1),
-            torch.cat([right_desired_position, right_desired_orientation], dim=-1),
+        Note:
+            The returned tensor is the persistent output buffer of the state machine and is
+            overwritten by the next call.
+        """
+        # convert all transformations from (w, x, y, z) to (x, y, z, w)
+        torch.index_select(ee_pose, 1, self._wxyz_to_xyzw, out=self._ee_buf)
+        torch.index_select(object_pose, 1, self._wxyz_to_xyzw, out=self._obj_buf)
+        torch.index_select(
+            des_object_pose, 1, self._wxyz_to_xyzw, out=self._des_obj_buf
         )
 
-        actions = torch.cat([left_actions, right_actions], dim=-1)
+        # run state machine
+        # note: the kernel writes the actions with quaternion as (w, x, y, z) in place
+        if self._graph is not None:
+            wp.capture_launch(self._graph)
+        else:
+            self._launch_state_machine()
 
-        return actions
+        return self.actions_buf
 
-class PickAndLiftRightArmSm:
-    """A variaty of PickAndLiftSm, using right arm only.
 
-    The state machine is implemented as a warp kernel. It takes in the current state of
-    the robot's end-effector and the object, and outputs the desired state of the robot's
-    end-effector and the gripper. The state machine is implemented as a finite state
-    machine with the following states:
+class PickAndLiftSm(_PickSmBase):
+    """A pick-and-lift state machine grasping the object with both arms.
 
-    1. REST: The robot is at rest.
-    2. APPROACH_ABOVE_OBJECT: The robot moves above the object.
-    3. APPROACH_OBJECT: The robot moves to the object.
-    4. GRASP_OBJECT: The robot grasps the object.
-    5. LIFT_OBJECT: The robot lifts the object to the desired pose. This is the final state.
+    The left arm occupies the state machines [0, num_envs) and the right arm
+    [num_envs, 2 * num_envs).
     """
 
+    num_arms = 2
+
     def __init__(
         self, task: str, dt: float, num_envs: int, device: torch.device | str = "cpu"
     ):
-        """Initialize the state machine.
+        super().__init__(task, dt, num_envs, device)
+        # grasping offsets on object for left/right grippers
+        self._left_object_offset = torch.zeros((self.num_envs, 3), device=self.device)
+        self._left_object_offset[:, 1] = self._off_y
+        self._left_object_offset[:, 2] = self._off_z
+        self._right_object_offset = torch.zeros((self.num_envs, 3), device=self.device)
+        self._right_object_offset[:, 1] = -self._off_y
+        self._right_object_offset[:, 2] = self._off_z
 
-        Args:
-            dt: The environment time step.
-            num_envs: The number of environments to simulate.
-            device: The device to run the state machine on.
-        """
-        # save parameters
-        self.dt = float(dt)
-        self.num_envs = num_envs
-        self.device = device
-        self.task = task
-        # initialize state machine
-        self.sm_dt = torch.full((self.num_envs,), self.dt, device=self.device)
-        self.sm_state = torch.full(
-            (self.num_envs,), 0, dtype=torch.int32, device=self.device
+    def generate_actions(self, env: gym.Env, goal_pos: torch.Tensor) -> torch.Tensor:
+        n = self.num_envs
+        # -- cache scene entities
+        self._update_scene_cache(env)
+        # -- end-effector frame
+        self._write_ee_pose(self._left_ee, self._ee_in[:n])
+        self._write_ee_pose(self._right_ee, self._ee_in[n:])
+
+        # -- object frame
+        object_position, object_orientation, object_orientation_yaw = (
+            self._object_frame()
         )
-        self.sm_wait_time = torch.zeros((self.num_envs,), device=self.device)
 
-        # desired state
-        self.des_ee_pose = torch.zeros((self.num_envs, 7), device=self.device)
-        self.des_gripper_state = torch.full((self.num_envs,), 0.0, device=self.device)
+        # -- the grasping poses on object for left/right grippers
+        self._obj_in[:n, :3], _ = combine_frame_transforms(
+            object_position, object_orientation, self._left_object_offset
+        )
+        self._obj_in[n:, :3], _ = combine_frame_transforms(
+            object_position, object_orientation, self._right_object_offset
+        )
 
-        # approach above object offset
-        self.offset = torch.zeros((self.num_envs, 7), device=self.device)
-        self.offset[:, 2] = 0.1
-        self.offset[:, -1] = 1.0  # warp expects quaternion as (x, y, z, w)
-        # print("[DEBUG] offset: ", self.offset)
+        # -- update left/right desired position
+        self._des_in[:n, :3] = goal_pos
+        self._des_in[:n, 1] += self._off_y
+        self._des_in[n:, :3] = goal_pos
+        self._des_in[n:, 1] -= self._off_y
+        # -- update left/right desired orientation (left arm first)
+        self._half_angle[:n] = object_orientation_yaw - self._off_yaw
+        self._half_angle[n:] = object_orientation_yaw + self._off_yaw
+        self._write_desired_orientation()
 
-        self.set_task_config()
+        # advance state machine for both arms at once
+        sm_actions = self.compute(self._ee_in, self._obj_in, self._des_in)
+        left_actions, right_actions = torch.split(sm_actions, n, dim=0)
 
-        # convert to warp
-        self.sm_dt_wp = wp.from_torch(self.sm_dt, wp.float32)
-        self.sm_state_wp = wp.from_torch(self.sm_state, wp.int32)
-        self.sm_wait_time_wp = wp.from_torch(self.sm_wait_time, wp.float32)
-        self.des_ee_pose_wp = wp.from_torch(self.des_ee_pose, wp.transform)
-        self.des_gripper_state_wp = wp.from_torch(self.des_gripper_state, wp.float32)
-        self.offset_wp = wp.from_torch(self.offset, wp.transform)
+        actions = torch.cat([left_actions, right_actions], dim=-1)
 
-    def set_task_config(self):
-        # offsets for different tasks
-        # x, y, z, roll, pitch, yaw
-        self.task_offset = torch.zeros(6, device=self.device)
-        if "cube" in self.task.lower():
-            self.task_offset[1] = 0.15
-            self.task_offset[2] = -0.005
-            self.task_offset[5] = 1.5707963
-        elif "bin" in self.task.lower():
-            self.task_offset[1] = 0.145
-            self.task_offset[2] = 0.025
-            self.task_offset[5] = 0.0
-        else:
-            raise ValueError(f"Unsupported task: {self.task} for generating actions.")
-        print("task: {}, offset: {}".format(self.task, self.task_offset))
+        return actions
 
-    def reset_idx(self, env_ids: Sequence[int] = None):
-        """Reset the state machine."""
-        if env_ids is None:
-            env_ids = slice(None)
-        self.sm_state[env_ids] = 0
-        self.sm_wait_time[env_ids] = 0.0
 
-    def compute(
-        self,
-        ee_pose: torch.Tensor,
-        object_pose: torch.Tensor,
-        des_object_pose: torch.Tensor,
-    ):
-        """Compute the desired state of the robot's end-effector and the gripper."""
-        # convert all transformations from (w, x, y, z) to (x, y, z, w)
-        ee_pose = ee_pose[:, [0, 1, 2, 4, 5, 6, 3]]
-        object_pose = object_pose[:, [0, 1, 2, 4, 5, 6, 3]]
-        des_object_pose = des_object_pose[:, [0, 1, 2, 4, 5, 6, 3]]
+class PickAndLiftRightArmSm(_PickSmBase):
+    """A variaty of PickAndLiftSm, using right arm only.
 
-        # convert to warp
-        ee_pose_wp = wp.from_torch(ee_pose.contiguous(), wp.transform)
-        object_pose_wp = wp.from_torch(object_pose.contiguous(), wp.transform)
-        des_object_pose_wp = wp.from_torch(des_object_pose.contiguous(), wp.transform)
+    The left arm stays at its current pose with the gripper open.
+    """
 
-        # run state machine
-        wp.launch(
-            kernel=infer_state_machine,
-            dim=self.num_envs,
-            inputs=[
-                self.sm_dt_wp,
-                self.sm_state_wp,
-                self.sm_wait_time_wp,
-                ee_pose_wp,
-                object_pose_wp,
-                des_object_pose_wp,
-                self.des_ee_pose_wp,
-                self.des_gripper_state_wp,
-                self.offset_wp,
-            ],
-            device=self.device,
-        )
+    num_arms = 1
 
-        # convert transformations back to (w, x, y, z)
-        des_ee_pose = self.des_ee_pose[:, [0, 1, 2, 6, 3, 4, 5]]
-        # convert to torch
-        return torch.cat([des_ee_pose, self.des_gripper_state.unsqueeze(-1)], dim=-1)
+    def __init__(
+        self, task: str, dt: float, num_envs: int, device: torch.device | str = "cpu"
+    ):
+        super().__init__(task, dt, num_envs, device)
+        # single hand just grasp at the center
+        self._right_object_offset = torch.zeros((self.num_envs, 3), device=self.device)
+        # left hand actions with the gripper kept open
+        self._left_actions = torch.zeros((self.num_envs, 8), device=self.device)
+        self._left_actions[:, 7] = 1.0
 
     def generate_actions(self, env: gym.Env, goal_pos: torch.Tensor) -> torch.Tensor:
+        # -- cache scene entities
+        self._update_scene_cache(env)
         # -- end-effector frame
-        left_ee_frame = env.unwrapped.scene["left_ee_frame"]
-        left_tcp_rest_position = (
-            left_ee_frame.data.target_pos_w[..., 0, :] - env.unwrapped.scene.env_origins
-        )
-        left_tcp_rest_orientation = left_ee_frame.data.target_quat_w[..., 0, :]
-
-        right_ee_frame = env.unwrapped.scene["right_ee_frame"]
-        right_tcp_rest_position = (
-            right_ee_frame.data.target_pos_w[..., 0, :]
-            - env.unwrapped.scene.env_origins
-        )
-        right_tcp_rest_orientation = right_ee_frame.data.target_quat_w[..., 0, :]
+        self._write_ee_pose(self._left_ee, self._left_actions)
+        self._write_ee_pose(self._right_ee, self._ee_in)
 
         # -- object frame
-        object_data = env.unwrapped.scene["object"].data
-        object_position = object_data.root_pos_w - env.unwrapped.scene.env_origins
-        object_orientation = object_data.root_quat_w
-        object_orientation_yaw = euler_xyz_from_quat(object_orientation)[2]
+        object_position, object_orientation, object_orientation_yaw = (
+            self._object_frame()
+        )
 
         # -- the grasping poses on object for right grippers
-        right_object_offset = torch.zeros_like(object_position)
         # single hand just grasp at the center
-        # right_object_offset[:, 1] = -self.task_offset[1]
-        # right_object_offset[:, 2] = self.task_offset[2]
-        right_object_position, _ = combine_frame_transforms(
-            object_position, object_orientation, right_object_offset
+        self._obj_in[:, :3], _ = combine_frame_transforms(
+            object_position, object_orientation, self._right_object_offset
         )
 
-
         # -- update right desired position
-        right_desired_position = goal_pos.clone()
+        self._des_in[:, :3] = goal_pos
         # single hand just grasp at the center
-        right_desired_position[:, 1] -= self.task_offset[1]
+        self._des_in[:, 1] -= self._off_y
         # -- update right desired orientation
-        r_orientation_offset_euler = torch.zeros_like(right_object_position)
-        r_orientation_offset_euler[:, 0] = object_orientation_yaw + self.task_offset[5]
-        r_orientation_offset_quat = quat_from_euler_xyz(
-            r_orientation_offset_euler[:, 0],
-            r_orientation_offset_euler[:, 1],
-            r_orientation_offset_euler[:, 2],
-        )
-        # conver to (z, w, x, y)
-        right_desired_orientation = r_orientation_offset_quat[:, [3, 0, 1, 2]]
+        torch.add(object_orientation_yaw, self._off_yaw, out=self._half_angle)
+        self._write_desired_orientation()
 
         # left hand always stay at the same position
-        left_actions = torch.cat([left_tcp_rest_position, left_tcp_rest_orientation, torch.tensor([[1.0]], device=self.device)], dim=-1)
-            
-        right_actions = self.compute(
-            torch.cat([right_tcp_rest_position, right_tcp_rest_orientation], dim=-1),
-            torch.cat([right_object_position, right_desired_orientation], dim=-1),
-            torch.cat([right_desired_position, right_desired_orientation], dim=-1),
-        )
+        right_actions = self.compute(self._ee_in, self._obj_in, self._des_in)
 
-        actions = torch.cat([left_actions, right_actions], dim=-1)
+        actions = torch.cat([self._left_actions, right_actions], dim=-1)
 
         return actions